@@ -30,9 +30,11 @@ class AgenticRAG:
         self.llm = Config.get_llm()
         self.doc_processor = DocumentProcessor(
             chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
+            chunk_overlap=Config.CHUNK_OVERLAP,
+            max_workers=Config.LOAD_WORKERS,
+            tokenizer_name=Config.EMBEDDING_MODEL
         )
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(model_name=Config.EMBEDDING_MODEL)
         
         # Process documents and create vector store
         self._setup_vectorstore()
@@ -40,7 +42,8 @@ class AgenticRAG:
         # Build graph
         self.graph_builder = GraphBuilder(
             retriever=self.vector_store.get_retriever(),
-            llm=self.llm
+            llm=self.llm,
+            parent_docs=self.vector_store.parent_docs
         )
         self.graph_builder.build()
         
@@ -49,11 +52,22 @@ class AgenticRAG:
     def _setup_vectorstore(self):
         """Setup vector store with processed documents"""
         print(f"📄 Processing {len(self.urls)} URLs...")
-        documents = self.doc_processor.process_urls(self.urls)
+        documents = self.doc_processor.load_urls(self.urls)
+        
+        # Same chunking as the Streamlit app
+        if Config.PARENT_CHILD_RETRIEVAL:
+            documents, parent_docs = self.doc_processor.split_hierarchical(
+                documents,
+                parent_size=Config.PARENT_CHUNK_SIZE,
+                child_size=Config.CHILD_CHUNK_SIZE,
+                overlap=Config.CHUNK_OVERLAP
+            )
+        else:
+            documents, parent_docs = self.doc_processor.split_documents(documents), {}
         print(f"📊 Created {len(documents)} document chunks")
         
         print("🔍 Creating vector store...")
-        self.vector_store.create_vectorstore(documents)
+        self.vector_store.create_vectorstore(documents, parent_docs=parent_docs)
     
     def ask(self, question: str) -> str:
         """
@@ -1,8 +1,8 @@
 """Configuration module for Agentic RAG system"""
 
 import os
+import functools
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 # Load environment variables
 load_dotenv()
@@ -16,9 +16,39 @@ class Config:
     # Model Configuration
     LLM_MODEL = "gemini-1.5-flash"
     
-    # Document Processing
-    CHUNK_SIZE = 500
-    CHUNK_OVERLAP = 50
+    # Embedding model; its tokenizer also measures chunk sizes. It is
+    # downloaded from the Hugging Face Hub on first use unless already cached.
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    
+    # Document Processing (chunk sizes are in embedding-model tokens; keep
+    # them under the model's 256-token input window)
+    CHUNK_SIZE = 200
+    CHUNK_OVERLAP = 20
+    # Parent-child retrieval: small children are embedded and matched, their
+    # parents go to the LLM (top-k parents of PARENT_CHUNK_SIZE each)
+    PARENT_CHILD_RETRIEVAL = os.getenv("PARENT_CHILD_RETRIEVAL", "true").lower() == "true"
+    CHILD_CHUNK_SIZE = 128
+    PARENT_CHUNK_SIZE = 512
+    LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "8"))
+    
+    # Embedding
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    # The local torch model already uses every core per batch, so extra
+    # embedding threads only help remote embedding APIs
+    EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+    
+    # Number of built RAG systems (one per corpus) kept in memory
+    MAX_CACHED_CORPORA = int(os.getenv("MAX_CACHED_CORPORA", "4"))
+    # Per-session answer cache: entry limit and lifetime in seconds
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "128"))
+    ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))
+    
+    # On-disk vector store cache, keyed by corpus fingerprint (empty disables).
+    # Saved indexes are unpickled on load, so this directory must only be
+    # writable by this app: anyone who can write to it can run code here.
+    VECTORSTORE_CACHE_DIR = os.getenv("VECTORSTORE_CACHE_DIR", "./vectorstore_cache")
+    # Least recently used vector stores beyond this count are deleted
+    VECTORSTORE_CACHE_MAX_ENTRIES = int(os.getenv("VECTORSTORE_CACHE_MAX_ENTRIES", "16"))
     
     # Default URLs
     DEFAULT_URLS = [
@@ -27,8 +57,11 @@ class Config:
     ]
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def get_llm(cls):
-        """Initialize and return the LLM model"""
+        """Initialize the LLM model once and return the shared instance"""
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        
         return ChatGoogleGenerativeAI(
             model=cls.LLM_MODEL,
             google_api_key=cls.GOOGLE_API_KEY
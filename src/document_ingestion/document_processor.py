@@ -1,37 +1,76 @@
 """Document processing module for loading and splitting documents"""
 
-from typing import List, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
-from langchain_community.document_loaders import (
-    WebBaseLoader,
-    PyPDFLoader,
-    TextLoader,
-    PyPDFDirectoryLoader
-)
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from src.config.config import Config
 import os
+import hashlib
+import functools
+import queue
+import threading
+
+
+# Prefer paragraph, then line, then sentence boundaries when splitting
+_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tokenizer(tokenizer_name: str):
+    """Return the Hugging Face tokenizer shared by all splitters using it"""
+    # Imported lazily: transformers is heavy, and the tokenizer files are the
+    # ones already downloaded (or cached) for the embedding model
+    from transformers import AutoTokenizer
+    
+    return AutoTokenizer.from_pretrained(tokenizer_name)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int,
+                  tokenizer_name: str = Config.EMBEDDING_MODEL) -> RecursiveCharacterTextSplitter:
+    """
+    Return a shared token-aware text splitter for the given chunking parameters
+    
+    Sizes are counted with the embedding model's own tokenizer, so a chunk
+    that fits chunk_size also fits the embedder's input window.
+    """
+    return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        _get_tokenizer(tokenizer_name),
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=_SEPARATORS
+    )
+
 
 class DocumentProcessor:
     """Handles document loading and processing"""
     
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    def __init__(self, chunk_size: int = 200, chunk_overlap: int = 20,
+                 max_workers: Optional[int] = None,
+                 tokenizer_name: str = Config.EMBEDDING_MODEL):
         """
         Initialize document processor
         
         Args:
-            chunk_size: Size of text chunks
-            chunk_overlap: Overlap between chunks
+            chunk_size: Size of text chunks, in tokens
+            chunk_overlap: Overlap between chunks, in tokens
+            max_workers: Maximum number of sources loaded concurrently
+                (defaults to one thread per source, capped at 32)
+            tokenizer_name: Hugging Face tokenizer used to count tokens;
+                should match the embedding model
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap
-        )
+        self.max_workers = max_workers
+        self.tokenizer_name = tokenizer_name
+        self.splitter = _get_splitter(chunk_size, chunk_overlap, tokenizer_name)
     
     def load_from_url(self, url: str) -> List[Document]:
         """Load document(s) from a URL"""
+        from langchain_community.document_loaders import WebBaseLoader
+        
         try:
             loader = WebBaseLoader(url)
             return loader.load()
@@ -40,16 +79,24 @@ class DocumentProcessor:
             return []
 
     def load_from_pdf_dir(self, directory: Union[str, Path]) -> List[Document]:
-        """Load documents from all PDFs inside a directory"""
+        """Load documents from all PDFs inside a directory, one thread per file"""
         try:
-            loader = PyPDFDirectoryLoader(str(directory))
-            return loader.load()
+            directory = Path(directory)
+            # Skip files inside hidden directories, as PyPDFDirectoryLoader did
+            pdf_paths = sorted(
+                str(path) for path in directory.glob("**/[!.]*.pdf")
+                if not any(part.startswith(".") for part in path.relative_to(directory).parts)
+            )
         except Exception as e:
             print(f"Error loading PDF directory {directory}: {str(e)}")
             return []
+        
+        return self._load_concurrently(self.load_from_pdf, pdf_paths)
 
     def load_from_txt(self, file_path: Union[str, Path]) -> List[Document]:
         """Load document(s) from a TXT file"""
+        from langchain_community.document_loaders import TextLoader
+        
         try:
             loader = TextLoader(str(file_path), encoding="utf-8")
             return loader.load()
@@ -59,9 +106,15 @@ class DocumentProcessor:
 
     def load_from_pdf(self, file_path: Union[str, Path]) -> List[Document]:
         """Load document(s) from a single PDF file"""
+        # PyMuPDF parses in C and releases the GIL, so PDFs load in parallel
+        from langchain_community.document_loaders import PyMuPDFLoader
+        
         try:
-            loader = PyPDFLoader(str(file_path))
+            loader = PyMuPDFLoader(str(file_path), extract_images=False)
             return loader.load()
+        except ImportError:
+            # pymupdf is missing - an install problem, not a bad file
+            raise
         except Exception as e:
             print(f"Error loading PDF file {file_path}: {str(e)}")
             return []
@@ -92,6 +145,61 @@ class DocumentProcessor:
             print(f"Unsupported file type: {extension}")
             return []
     
+    def load_from_source(self, src: str) -> List[Document]:
+        """
+        Load documents from a single URL, PDF directory, or file
+        
+        Args:
+            src: URL, directory path, or file path
+            
+        Returns:
+            List of loaded documents
+        """
+        if src.startswith("http://") or src.startswith("https://"):
+            # Handle URL
+            return self.load_from_url(src)
+        
+        # Handle local path
+        path = Path(src)
+        
+        if path.is_file():
+            # Single file
+            return self.load_from_file(path)
+        elif path.is_dir():
+            # Directory - load all PDFs
+            return self.load_from_pdf_dir(path)
+        
+        print(f"Path does not exist: {src}")
+        return []
+    
+    def _load_concurrently(self, load_fn: Callable[[str], List[Document]],
+                           sources: Iterable[str]) -> List[Document]:
+        """
+        Run a loader over several sources on a thread pool
+        
+        Loading is I/O-bound (HTTP for URLs, disk for files), so threads
+        overlap the wait time. Results keep the order of ``sources``.
+        
+        Args:
+            load_fn: Loader applied to each source
+            sources: Sources to load
+            
+        Returns:
+            List of loaded documents
+        """
+        sources = list(sources)
+        if not sources:
+            return []
+        
+        max_workers = min(self.max_workers or 32, len(sources))
+        docs: List[Document] = []
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for source_docs in executor.map(load_fn, sources):
+                docs.extend(source_docs)
+        
+        return docs
+    
     def load_documents(self, sources: List[str]) -> List[Document]:
         """
         Load documents from URLs, PDF directories, or individual files
@@ -102,24 +210,39 @@ class DocumentProcessor:
         Returns:
             List of loaded documents
         """
-        docs: List[Document] = []
+        return self._load_concurrently(self.load_from_source, sources)
+    
+    def load_files(self, file_paths: List[str]) -> List[Document]:
+        """
+        Load uploaded files without splitting them
         
-        for src in sources:
-            if src.startswith("http://") or src.startswith("https://"):
-                # Handle URL
-                docs.extend(self.load_from_url(src))
-            else:
-                # Handle local path
-                path = Path(src)
-                
-                if path.is_file():
-                    # Single file
-                    docs.extend(self.load_from_file(path))
-                elif path.is_dir():
-                    # Directory - load all PDFs
-                    docs.extend(self.load_from_pdf_dir(path))
-                else:
-                    print(f"Path does not exist: {src}")
+        Args:
+            file_paths: List of file paths to load
+            
+        Returns:
+            List of loaded documents
+        """
+        docs = self._load_concurrently(self.load_from_file, file_paths)
+        
+        if not docs:
+            raise ValueError("No documents could be loaded from the provided files")
+        
+        return docs
+    
+    def load_urls(self, urls: List[str]) -> List[Document]:
+        """
+        Load URLs without splitting them
+        
+        Args:
+            urls: List of URLs to load
+            
+        Returns:
+            List of loaded documents
+        """
+        docs = self._load_concurrently(self.load_from_url, urls)
+        
+        if not docs:
+            raise ValueError("No documents could be loaded from the provided URLs")
         
         return docs
     
@@ -133,16 +256,7 @@ class DocumentProcessor:
         Returns:
             List of processed document chunks
         """
-        docs = []
-        
-        for file_path in file_paths:
-            file_docs = self.load_from_file(file_path)
-            docs.extend(file_docs)
-        
-        if not docs:
-            raise ValueError("No documents could be loaded from the provided files")
-        
-        return self.split_documents(docs)
+        return self.split_documents(self.load_files(file_paths))
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
@@ -159,6 +273,180 @@ class DocumentProcessor:
         
         return self.splitter.split_documents(documents)
     
+    def iter_process_files(self, file_paths: List[str],
+                           split_fn: Optional[Callable[[List[Document]], List[Document]]] = None
+                           ) -> Iterator[List[Document]]:
+        """
+        Yield the chunks of each file as soon as that file has been parsed
+        
+        Files are loaded on the thread pool and yielded in completion order,
+        so downstream work (e.g. embedding) can start before all files are read.
+        
+        Args:
+            file_paths: List of file paths to process
+            split_fn: Splits one file's documents into chunks
+                (defaults to split_documents)
+            
+        Returns:
+            Iterator over per-file lists of document chunks
+        """
+        split_fn = split_fn or self.split_documents
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+        
+        max_workers = min(self.max_workers or 32, len(file_paths))
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.load_from_file, path) for path in file_paths]
+            for future in as_completed(futures):
+                docs = future.result()
+                if docs:
+                    yield split_fn(docs)
+    
+    def split_hierarchical(self, documents: List[Document], parent_size: int,
+                           child_size: int, overlap: Optional[int] = None
+                           ) -> Tuple[List[Document], Dict[str, str]]:
+        """
+        Split documents into small child chunks linked to larger parent chunks
+        
+        Children are meant to be embedded and retrieved; each carries a
+        ``parent_id`` in its metadata pointing at the parent text handed to
+        the LLM.
+        
+        Args:
+            documents: List of documents to split
+            parent_size: Size of parent chunks, in tokens
+            child_size: Size of child chunks, in tokens
+            overlap: Overlap between chunks at both levels, in tokens
+                (defaults to the processor's chunk_overlap)
+            
+        Returns:
+            Tuple of (child chunks, mapping of parent_id to parent text)
+        """
+        if not documents:
+            return [], {}
+        
+        if overlap is None:
+            overlap = self.chunk_overlap
+        parent_splitter = _get_splitter(parent_size, overlap, self.tokenizer_name)
+        child_splitter = _get_splitter(child_size, overlap, self.tokenizer_name)
+        
+        children: List[Document] = []
+        parents: Dict[str, str] = {}
+        
+        for parent in parent_splitter.split_documents(documents):
+            # Content-derived ids stay stable across runs, so persisted child
+            # chunks still resolve to their parents
+            parent_id = hashlib.blake2b(parent.page_content.encode(), digest_size=16).hexdigest()
+            parent.metadata["parent_id"] = parent_id
+            parents[parent_id] = parent.page_content
+            children.extend(child_splitter.split_documents([parent]))
+        
+        return children, parents
+    
+    def embed_chunks(self, chunks: List[Document], embedder,
+                     batch_size: int = 64) -> List[List[float]]:
+        """
+        Embed document chunks in batches
+        
+        Args:
+            chunks: List of document chunks to embed
+            embedder: Embeddings instance exposing embed_documents
+            batch_size: Number of chunks sent per embedding call
+            
+        Returns:
+            List of embedding vectors, one per chunk
+        """
+        embeddings: List[List[float]] = []
+        
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            embeddings.extend(
+                embedder.embed_documents([chunk.page_content for chunk in batch])
+            )
+        
+        return embeddings
+    
+    def embed_chunk_stream(self, chunk_groups: Iterable[List[Document]], embedder,
+                           batch_size: int = 64, max_workers: int = 1,
+                           on_progress: Optional[Callable[[int], None]] = None,
+                           max_queued_batches: int = 4
+                           ) -> Tuple[List[Document], List[List[float]]]:
+        """
+        Embed chunks in batches while they are still being produced
+        
+        Full batches go onto a bounded queue drained by embedding threads,
+        so embedding overlaps with loading and parsing of later files. When
+        the queue is full, parsing waits for the embedders to catch up.
+        
+        Args:
+            chunk_groups: Iterable of chunk lists, e.g. from iter_process_files
+            embedder: Embeddings instance exposing embed_documents
+            batch_size: Number of chunks sent per embedding call
+            max_workers: Number of embedding threads
+            on_progress: Called with the number of chunks seen so far
+            max_queued_batches: Batches allowed to wait for an embedder
+            
+        Returns:
+            Tuple of (all chunks, embedding vectors aligned with them)
+        """
+        chunks: List[Document] = []
+        # (batch index, texts) items, ended by one None per worker
+        batches = queue.Queue(maxsize=max_queued_batches)
+        results: Dict[int, List[List[float]]] = {}
+        errors: List[Exception] = []
+        
+        def embed_worker():
+            while (item := batches.get()) is not None:
+                index, texts = item
+                # After a failure keep draining, so the producer never blocks
+                if errors:
+                    continue
+                try:
+                    results[index] = embedder.embed_documents(texts)
+                except Exception as e:
+                    errors.append(e)
+        
+        workers = [threading.Thread(target=embed_worker, daemon=True) for _ in range(max_workers)]
+        for worker in workers:
+            worker.start()
+        
+        batch: List[Document] = []
+        batch_count = 0
+        
+        def put(batch: List[Document]):
+            nonlocal batch_count
+            batches.put((batch_count, [chunk.page_content for chunk in batch]))
+            batch_count += 1
+        
+        try:
+            for group in chunk_groups:
+                if errors:
+                    break
+                for chunk in group:
+                    chunks.append(chunk)
+                    batch.append(chunk)
+                    if len(batch) == batch_size:
+                        put(batch)
+                        batch = []
+                if on_progress is not None:
+                    on_progress(len(chunks))
+            
+            if batch and not errors:
+                put(batch)
+        finally:
+            for _ in workers:
+                batches.put(None)
+            for worker in workers:
+                worker.join()
+        
+        if errors:
+            raise errors[0]
+        
+        embeddings = [vector for index in range(batch_count) for vector in results[index]]
+        return chunks, embeddings
+    
     def process_urls(self, urls: List[str]) -> List[Document]:
         """
         Complete pipeline to load and split documents from URLs
@@ -169,16 +457,7 @@ class DocumentProcessor:
         Returns:
             List of processed document chunks
         """
-        docs = []
-        
-        for url in urls:
-            url_docs = self.load_from_url(url)
-            docs.extend(url_docs)
-        
-        if not docs:
-            raise ValueError("No documents could be loaded from the provided URLs")
-        
-        return self.split_documents(docs)
+        return self.split_documents(self.load_urls(urls))
     
     def process_mixed_sources(self, sources: List[str]) -> List[Document]:
         """
@@ -1,21 +1,48 @@
 """Graph builder for LangGraph workflow"""
 
+import asyncio
+import queue
+import threading
+from typing import Dict, List, Optional
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from src.state.rag_state import RAGState
 from src.node.reactnode import RAGNodes
 
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return a process-wide event loop running on a background thread
+    
+    Async clients (e.g. the cached Gemini grpc.aio channel) bind to the loop
+    they first run on, so every streamed run must share this one loop rather
+    than creating a new loop per question.
+    """
+    global _event_loop
+    if _event_loop is None:
+        with _event_loop_lock:
+            # Another thread may have created it while we waited
+            if _event_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="rag-event-loop", daemon=True).start()
+                _event_loop = loop
+    return _event_loop
+
 class GraphBuilder:
     """Builds and manages the LangGraph workflow"""
     
-    def __init__(self, retriever, llm):
+    def __init__(self, retriever, llm, parent_docs: Optional[Dict[str, str]] = None):
         """
         Initialize graph builder
         
         Args:
             retriever: Document retriever instance
             llm: Language model instance
+            parent_docs: Optional mapping of parent_id to parent chunk text
         """
-        self.nodes = RAGNodes(retriever, llm)
+        self.nodes = RAGNodes(retriever, llm, parent_docs)
         self.graph = None
     
     def build(self):
@@ -28,9 +55,13 @@ class GraphBuilder:
         # Create state graph
         builder = StateGraph(RAGState)
         
-        # Add nodes
-        builder.add_node("retriever", self.nodes.retrieve_docs)
-        builder.add_node("responder", self.nodes.generate_answer)
+        # Add nodes (sync functions for invoke/batch, async ones for ainvoke)
+        builder.add_node("retriever", RunnableLambda(
+            self.nodes.retrieve_docs, afunc=self.nodes.aretrieve_docs
+        ))
+        builder.add_node("responder", RunnableLambda(
+            self.nodes.generate_answer, afunc=self.nodes.agenerate_answer
+        ))
         
         # Set entry point
         builder.set_entry_point("retriever")
@@ -57,4 +88,74 @@ class GraphBuilder:
             self.build()
         
         initial_state = RAGState(question=question)
-        return self.graph.invoke(initial_state)
\ No newline at end of file
+        return self.graph.invoke(initial_state)
+    
+    async def arun(self, question: str) -> dict:
+        """
+        Run the RAG workflow asynchronously
+        
+        Args:
+            question: User question
+            
+        Returns:
+            Final state with answer
+        """
+        if self.graph is None:
+            self.build()
+        
+        initial_state = RAGState(question=question)
+        return await self.graph.ainvoke(initial_state)
+    
+    def run_batch(self, questions: List[str]) -> List[dict]:
+        """
+        Run the RAG workflow for several questions at once
+        
+        Args:
+            questions: User questions
+            
+        Returns:
+            Final states with answers, in the order of questions
+        """
+        if self.graph is None:
+            self.build()
+        
+        initial_states = [RAGState(question=question) for question in questions]
+        return self.graph.batch(initial_states)
+    
+    def run_stream(self, question: str) -> dict:
+        """
+        Run the RAG workflow while streaming answer tokens
+        
+        The graph runs through its async path on a shared background event
+        loop. The returned dict holds an ``answer_stream`` iterator of tokens.
+        Once it is exhausted, the dict is updated with the final state
+        (including ``answer`` and ``retrieved_docs``).
+        
+        Args:
+            question: User question
+            
+        Returns:
+            Dict with the token stream, filled with the final state afterwards
+        """
+        if self.graph is None:
+            self.build()
+        
+        tokens = queue.Queue()
+        result = {}
+        
+        def answer_stream():
+            future = asyncio.run_coroutine_threadsafe(
+                self.graph.ainvoke(
+                    RAGState(question=question),
+                    config={"configurable": {"on_token": tokens.put}}
+                ),
+                _get_event_loop()
+            )
+            future.add_done_callback(lambda _: tokens.put(None))
+            while (token := tokens.get()) is not None:
+                yield token
+            # Re-raises any error from the graph run
+            result.update(future.result())
+        
+        result["answer_stream"] = answer_stream()
+        return result
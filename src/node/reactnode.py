@@ -1,30 +1,130 @@
 """Smart Fallback RAG Node - Documents First, Wikipedia as Fallback"""
 
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
+import asyncio
 from src.state.rag_state import RAGState
 
 from langchain_core.documents import Document
 from langchain_core.tools import Tool
 from langchain_core.messages import HumanMessage
-from langgraph.prebuilt import create_react_agent
-
-# Wikipedia tool
-from langchain_community.utilities import WikipediaAPIWrapper
-from langchain_community.tools.wikipedia.tool import WikipediaQueryRun
+from langchain_core.runnables import RunnableConfig
+from langchain_core.prompts import ChatPromptTemplate
 import re
+import functools
+import threading
+import weakref
+from collections import OrderedDict
+
+# Static prompt templates, compiled once per RAGNodes instance
+DOC_PROMPT_TEMPLATE = """Answer the user's question based on the provided context from uploaded documents.
+
+CONTEXT FROM UPLOADED DOCUMENTS:
+{context}
+
+USER QUESTION: {question}
+
+INSTRUCTIONS:
+- Answer based on the provided context above
+- If the context contains the answer, provide a comprehensive response
+- If the context doesn't contain enough information, clearly state "The uploaded documents don't contain sufficient information about [topic]."
+- Be specific about what information is missing
+
+ANSWER:"""
+
+WIKI_PROMPT_TEMPLATE = """You are answering a question where the user's uploaded documents had limited information.
+
+ORIGINAL QUESTION: {question}
+
+ANSWER FROM UPLOADED DOCUMENTS:
+{doc_answer}
+
+ADDITIONAL WIKIPEDIA INFORMATION:
+{wiki_content}
+
+INSTRUCTIONS:
+- First acknowledge what was found in the uploaded documents
+- Then supplement with relevant Wikipedia information
+- Clearly distinguish between information from documents vs. Wikipedia
+- Provide a comprehensive answer combining both sources
+- Format as: "Based on your uploaded documents: [doc info]. Additionally, from general knowledge: [wiki info]."
+
+FINAL ANSWER:"""
 
 class RAGNodes:
     """Contains node functions for RAG workflow with smart fallback"""
     
-    def __init__(self, retriever, llm):
+    # Separates the document answer from the Wikipedia-supplemented answer
+    _FALLBACK_SEPARATOR = "\n\n---\n\n"
+    
+    # Phrases signalling that the documents could not answer the question
+    _INCOMPLETE_RE = re.compile(
+        r"no information|not found|cannot find|not mentioned|not provided|"
+        r"not available|insufficient information|don't have enough|"
+        r"context doesn't contain|not in the documents|need more context|"
+        r"please provide|i need more|cannot answer|unable to answer",
+        re.IGNORECASE
+    )
+    
+    # Common question words excluded from Wikipedia queries
+    _STOP_WORDS = frozenset({
+        'what', 'how', 'why', 'when', 'where', 'who', 'which', 'is', 'are',
+        'do', 'does', 'can', 'will', 'would', 'should'
+    })
+    _WORD_RE = re.compile(r'\b\w+\b')
+    
+    # Wikipedia lookups, shared by all instances and keyed by search query.
+    # Full summaries (sync path) and intro extracts (async path) are kept in
+    # separate LRU caches; the lock guards both across threads.
+    _WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+    # Wikimedia's API policy asks clients for a descriptive User-Agent
+    _WIKI_USER_AGENT = "AgenticRAG/0.1 (https://github.com/abdulreha/Agentic_RAG)"
+    _WIKI_TOP_K = 3
+    _WIKI_CACHE_SIZE = 256
+    _wiki_cache: "OrderedDict[str, str]" = OrderedDict()
+    _wiki_intro_cache: "OrderedDict[str, str]" = OrderedDict()
+    _wiki_cache_lock = threading.Lock()
+    # One aiohttp session per event loop, so connections are reused
+    _wiki_sessions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    
+    def __init__(self, retriever, llm, parent_docs: Optional[Dict[str, str]] = None):
         self.retriever = retriever
         self.llm = llm
-        self.wiki_wrapper = WikipediaAPIWrapper(top_k_results=3, lang="en")
-        self.wiki_tool = WikipediaQueryRun(api_wrapper=self.wiki_wrapper)
+        self._doc_prompt = ChatPromptTemplate.from_template(DOC_PROMPT_TEMPLATE)
+        self._wiki_prompt = ChatPromptTemplate.from_template(WIKI_PROMPT_TEMPLATE)
+        self._doc_chain = self._doc_prompt | self.llm
+        self._wiki_chain = self._wiki_prompt | self.llm
+        # Parent chunk text by parent_id, for small-to-big retrieval
+        self.parent_docs = parent_docs or {}
+
+    @functools.cached_property
+    def wiki_tool(self):
+        """Wikipedia tool, created (and imported) on first use"""
+        from langchain_community.utilities import WikipediaAPIWrapper
+        from langchain_community.tools.wikipedia.tool import WikipediaQueryRun
+        
+        wiki_wrapper = WikipediaAPIWrapper(top_k_results=self._WIKI_TOP_K, lang="en")
+        return WikipediaQueryRun(api_wrapper=wiki_wrapper)
+
+    @staticmethod
+    def dedupe_docs(docs: List[Document]) -> List[Document]:
+        """
+        Drop retrieved documents whose content duplicates an earlier one
+        
+        Uses a cheap signature (length plus the first 128 characters) so
+        repeated chunks don't inflate the prompt.
+        """
+        unique_docs = []
+        seen = set()
+        for doc in docs:
+            sig = hash((len(doc.page_content), doc.page_content[:128]))
+            if sig not in seen:
+                seen.add(sig)
+                unique_docs.append(doc)
+        return unique_docs
 
     def retrieve_docs(self, state: RAGState) -> RAGState:
         """Retrieve documents from uploaded content"""
-        docs = self.retriever.invoke(state.question)
+        docs = self.dedupe_docs(self.retriever.invoke(state.question))
         print(f"DEBUG: Retrieved {len(docs)} documents from uploaded content")
         
         return RAGState(
@@ -32,138 +132,355 @@ class RAGNodes:
             retrieved_docs=docs
         )
 
+    async def aretrieve_docs(self, state: RAGState) -> RAGState:
+        """Async variant of retrieve_docs"""
+        docs = self.dedupe_docs(await self.retriever.ainvoke(state.question))
+        print(f"DEBUG: Retrieved {len(docs)} documents from uploaded content")
+        
+        return RAGState(
+            question=state.question,
+            retrieved_docs=docs
+        )
+
+    def expand_to_parents(self, docs: List[Document]) -> List[Document]:
+        """
+        Replace retrieved child chunks with their parent chunks
+        
+        Children sharing a parent collapse into a single parent document;
+        chunks without a known parent are kept as they are.
+        """
+        if not self.parent_docs:
+            return docs
+        
+        expanded = []
+        seen_parents = set()
+        for doc in docs:
+            parent_id = doc.metadata.get("parent_id")
+            if parent_id not in self.parent_docs:
+                expanded.append(doc)
+            elif parent_id not in seen_parents:
+                seen_parents.add(parent_id)
+                expanded.append(Document(
+                    page_content=self.parent_docs[parent_id],
+                    metadata=doc.metadata
+                ))
+        return expanded
+
     def is_incomplete_answer(self, answer: str) -> bool:
         """
         Determine if the answer is incomplete or indicates missing information
         """
-        incomplete_indicators = [
-            "no information",
-            "not found",
-            "cannot find",
-            "not mentioned",
-            "not provided",
-            "not available",
-            "insufficient information",
-            "don't have enough",
-            "context doesn't contain",
-            "not in the documents",
-            "need more context",
-            "please provide",
-            "i need more",
-            "cannot answer",
-            "unable to answer"
-        ]
+        return bool(self._INCOMPLETE_RE.search(answer))
+
+    def stream_llm(self, chain, inputs: dict,
+                   on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Stream a prompt | LLM chain, forwarding each token to on_token
         
-        answer_lower = answer.lower()
-        return any(indicator in answer_lower for indicator in incomplete_indicators)
+        Returns the full concatenated response.
+        """
+        parts = []
+        for chunk in chain.stream(inputs):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if not text:
+                continue
+            parts.append(text)
+            if on_token is not None:
+                on_token(text)
+        return "".join(parts)
+
+    @staticmethod
+    def _emit(text: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Forward a fixed response to on_token, so it is streamed like LLM output"""
+        if on_token is not None:
+            on_token(text)
+        return text
+
+    async def astream_llm(self, chain, inputs: dict,
+                          on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Async variant of stream_llm"""
+        parts = []
+        async for chunk in chain.astream(inputs):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if not text:
+                continue
+            parts.append(text)
+            if on_token is not None:
+                on_token(text)
+        return "".join(parts)
 
-    def answer_with_documents(self, state: RAGState) -> str:
+    def build_document_context(self, state: RAGState) -> str:
         """
-        Generate answer using only uploaded documents
+        Build the document context for the prompt from the retrieved documents
         """
-        if not state.retrieved_docs:
-            return "No relevant documents found in uploaded content."
-        
-        # Combine retrieved documents into context
+        # Combine retrieved documents into context with a single join
         context_parts = []
-        for i, doc in enumerate(state.retrieved_docs, 1):
+        for i, doc in enumerate(self.expand_to_parents(state.retrieved_docs), 1):
             meta = doc.metadata if hasattr(doc, "metadata") else {}
             source = meta.get("source", meta.get("title", f"Document {i}"))
-            context_parts.append(f"[Document {i} - {source}]\n{doc.page_content}")
+            context_parts.extend(("[Document ", str(i), " - ", str(source), "]\n", doc.page_content, "\n\n"))
         
-        full_context = "\n\n".join(context_parts)
+        context_parts.pop()  # drop the trailing separator
+        return "".join(context_parts)
+
+    def answer_with_documents(self, state: RAGState,
+                              on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate answer using only uploaded documents
+        """
+        if not state.retrieved_docs:
+            return self._emit("No relevant documents found in uploaded content.", on_token)
         
-        # Create prompt for document-only answer
-        prompt = f"""Answer the user's question based on the provided context from uploaded documents.
+        inputs = {"context": self.build_document_context(state), "question": state.question}
+        return self.stream_llm(self._doc_chain, inputs, on_token)
 
-CONTEXT FROM UPLOADED DOCUMENTS:
-{full_context}
+    async def aanswer_with_documents(self, state: RAGState,
+                                     on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Async variant of answer_with_documents"""
+        if not state.retrieved_docs:
+            return self._emit("No relevant documents found in uploaded content.", on_token)
+        
+        inputs = {"context": self.build_document_context(state), "question": state.question}
+        return await self.astream_llm(self._doc_chain, inputs, on_token)
 
-USER QUESTION: {state.question}
+    @classmethod
+    def _cached_wikipedia(cls, cache: "OrderedDict[str, str]", wiki_query: str) -> Optional[str]:
+        """Return cached Wikipedia content for a query, or None"""
+        with cls._wiki_cache_lock:
+            if wiki_query not in cache:
+                return None
+            cache.move_to_end(wiki_query)
+            return cache[wiki_query]
 
-INSTRUCTIONS:
-- Answer based on the provided context above
-- If the context contains the answer, provide a comprehensive response
-- If the context doesn't contain enough information, clearly state "The uploaded documents don't contain sufficient information about [topic]."
-- Be specific about what information is missing
+    @classmethod
+    def _cache_wikipedia(cls, cache: "OrderedDict[str, str]", wiki_query: str, wiki_content: str) -> str:
+        """Store Wikipedia content for a query, evicting the least recently used entry when full"""
+        with cls._wiki_cache_lock:
+            cache[wiki_query] = wiki_content
+            cache.move_to_end(wiki_query)
+            if len(cache) > cls._WIKI_CACHE_SIZE:
+                cache.popitem(last=False)
+        return wiki_content
 
-ANSWER:"""
+    @classmethod
+    def _wiki_session(cls):
+        """Return the aiohttp session for the running event loop, creating it on first use"""
+        import aiohttp
+        
+        loop = asyncio.get_running_loop()
+        session = cls._wiki_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={"User-Agent": cls._WIKI_USER_AGENT}
+            )
+            cls._wiki_sessions[loop] = session
+        return session
 
-        try:
-            response = self.llm.invoke(prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-        except Exception as e:
-            return f"Error processing documents: {str(e)}"
+    @staticmethod
+    def _discard_task(task: asyncio.Task):
+        """Cancel a speculative task, retrieving any exception it already raised"""
+        task.cancel()
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def fetch_wikipedia(self, question: str) -> str:
+        """
+        Fetch Wikipedia content relevant to the question
+        """
+        # Create a more specific Wikipedia query based on the question
+        wiki_query = self.extract_key_terms(question)
+        cached = self._cached_wikipedia(self._wiki_cache, wiki_query)
+        if cached is not None:
+            return cached
+        return self._cache_wikipedia(self._wiki_cache, wiki_query, self.wiki_tool.run(wiki_query))
+
+    async def afetch_wikipedia(self, question: str) -> str:
+        """
+        Fetch intro extracts of Wikipedia pages relevant to the question
+        
+        Queries the MediaWiki API directly with aiohttp. Intro extracts are
+        much shorter than full page summaries, keeping the combined prompt small.
+        """
+        wiki_query = self.extract_key_terms(question)
+        cached = self._cached_wikipedia(self._wiki_intro_cache, wiki_query)
+        if cached is not None:
+            return cached
+        
+        params = {
+            "action": "query",
+            "format": "json",
+            "generator": "search",
+            "gsrsearch": wiki_query,
+            "gsrlimit": self._WIKI_TOP_K,
+            "prop": "extracts",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": self._WIKI_TOP_K,
+        }
+        async with self._wiki_session().get(self._WIKI_API_URL, params=params) as response:
+            response.raise_for_status()
+            data = await response.json()
+        
+        # Keep search ranking order, formatted like WikipediaQueryRun output
+        pages = sorted(
+            data.get("query", {}).get("pages", {}).values(),
+            key=lambda page: page.get("index", 0)
+        )
+        summaries = [
+            f"Page: {page['title']}\nSummary: {page['extract']}"
+            for page in pages if page.get("extract")
+        ]
+        wiki_content = "\n\n".join(summaries) or "No good Wikipedia Search Result was found"
+        return self._cache_wikipedia(self._wiki_intro_cache, wiki_query, wiki_content)
 
-    def answer_with_wikipedia(self, state: RAGState, doc_answer: str) -> str:
+    def answer_with_wikipedia(self, state: RAGState, doc_answer: str,
+                              on_token: Optional[Callable[[str], None]] = None) -> str:
         """
         Use Wikipedia to supplement the document answer
         """
         print("DEBUG: Using Wikipedia fallback for additional information")
         
-        # Create a more specific Wikipedia query based on the question
-        wiki_query = self.extract_key_terms(state.question)
+        # Get Wikipedia content
+        wiki_content = self.fetch_wikipedia(state.question)
         
-        try:
-            # Get Wikipedia content
-            wiki_content = self.wiki_tool.run(wiki_query)
-            
-            # Combine document answer with Wikipedia info
-            combined_prompt = f"""You are answering a question where the user's uploaded documents had limited information.
-
-ORIGINAL QUESTION: {state.question}
-
-ANSWER FROM UPLOADED DOCUMENTS:
-{doc_answer}
-
-ADDITIONAL WIKIPEDIA INFORMATION:
-{wiki_content}
-
-INSTRUCTIONS:
-- First acknowledge what was found in the uploaded documents
-- Then supplement with relevant Wikipedia information
-- Clearly distinguish between information from documents vs. Wikipedia
-- Provide a comprehensive answer combining both sources
-- Format as: "Based on your uploaded documents: [doc info]. Additionally, from general knowledge: [wiki info]."
-
-FINAL ANSWER:"""
+        # Combine document answer with Wikipedia info
+        inputs = {"question": state.question, "doc_answer": doc_answer, "wiki_content": wiki_content}
+        return self.stream_llm(self._wiki_chain, inputs, on_token)
 
-            response = self.llm.invoke(combined_prompt)
-            return response.content if hasattr(response, 'content') else str(response)
-            
-        except Exception as e:
-            return f"{doc_answer}\n\nNote: Could not retrieve additional information from Wikipedia due to error: {str(e)}"
+    async def aanswer_with_wikipedia(self, state: RAGState, doc_answer: str,
+                                     wiki_task: Optional[asyncio.Task] = None,
+                                     on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Async variant of answer_with_wikipedia, awaiting wiki_task if given"""
+        print("DEBUG: Using Wikipedia fallback for additional information")
+        
+        # Get Wikipedia content
+        if wiki_task is not None:
+            wiki_content = await wiki_task
+        else:
+            wiki_content = await self.afetch_wikipedia(state.question)
+        
+        # Combine document answer with Wikipedia info
+        inputs = {"question": state.question, "doc_answer": doc_answer, "wiki_content": wiki_content}
+        return await self.astream_llm(self._wiki_chain, inputs, on_token)
 
-    def extract_key_terms(self, question: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def extract_key_terms(question: str) -> str:
         """
         Extract key terms from the question for better Wikipedia search
         """
-        # Remove common question words and extract main terms
-        stop_words = {'what', 'how', 'why', 'when', 'where', 'who', 'which', 'is', 'are', 'do', 'does', 'can', 'will', 'would', 'should'}
-        
-        # Clean and split the question
-        words = re.findall(r'\b\w+\b', question.lower())
-        key_words = [word for word in words if word not in stop_words and len(word) > 2]
+        # Clean and split the question, dropping common question words
+        key_words = [
+            word for word in RAGNodes._WORD_RE.findall(question.lower())
+            if len(word) > 2 and word not in RAGNodes._STOP_WORDS
+        ]
         
         # Return the original question if we can't extract good terms
         return ' '.join(key_words[:5]) if key_words else question
 
-    def generate_answer(self, state: RAGState) -> RAGState:
+    @staticmethod
+    def _failed_state(state: RAGState, answer: str, error: Exception,
+                      on_token: Optional[Callable[[str], None]] = None,
+                      streamed_message: Optional[str] = None) -> RAGState:
+        """
+        Build the final state for an answer that hit an error
+        
+        The error is recorded on the state so callers can avoid caching it.
+        """
+        if on_token is not None:
+            on_token(streamed_message if streamed_message is not None else answer)
+        
+        return RAGState(
+            question=state.question,
+            retrieved_docs=state.retrieved_docs,
+            answer=answer,
+            error=str(error)
+        )
+
+    @staticmethod
+    def _wikipedia_error_note(error: Exception) -> str:
+        """Note appended to the document answer when the Wikipedia fallback fails"""
+        return f"Note: Could not retrieve additional information from Wikipedia due to error: {str(error)}"
+
+    def generate_answer(self, state: RAGState,
+                        config: Optional[RunnableConfig] = None) -> RAGState:
         """
         Smart fallback approach: Try documents first, then Wikipedia if needed
+        
+        Answer tokens are forwarded to the ``on_token`` callback from the
+        ``configurable`` section of the run config, when one is given.
+        """
+        print(f"DEBUG: Starting smart fallback approach with {len(state.retrieved_docs)} retrieved docs")
+        on_token = (config or {}).get("configurable", {}).get("on_token")
+        
+        # Step 1: Try to answer with uploaded documents
+        try:
+            doc_answer = self.answer_with_documents(state, on_token)
+        except Exception as e:
+            return self._failed_state(state, f"Error processing documents: {str(e)}", e, on_token)
+        print(f"DEBUG: Document answer: {doc_answer[:100]}...")
+        
+        # Step 2: Check if the answer is incomplete
+        if self.is_incomplete_answer(doc_answer):
+            print("DEBUG: Document answer incomplete, trying Wikipedia fallback")
+            # The final answer is exactly what was streamed: the document
+            # answer, a separator, then the supplemented answer (or a note)
+            answer_prefix = doc_answer + self._FALLBACK_SEPARATOR
+            if on_token is not None:
+                on_token(self._FALLBACK_SEPARATOR)
+            try:
+                final_answer = answer_prefix + self.answer_with_wikipedia(state, doc_answer, on_token)
+            except Exception as e:
+                note = self._wikipedia_error_note(e)
+                return self._failed_state(state, answer_prefix + note, e, on_token, note)
+        else:
+            print("DEBUG: Document answer sufficient, using document-only response")
+            final_answer = doc_answer
+        
+        return RAGState(
+            question=state.question,
+            retrieved_docs=state.retrieved_docs,
+            answer=final_answer
+        )
+
+    async def agenerate_answer(self, state: RAGState,
+                               config: Optional[RunnableConfig] = None) -> RAGState:
+        """
+        Async variant of generate_answer
+        
+        The Wikipedia lookup runs as a task alongside the document LLM call
+        and is cancelled if the document answer turns out to be sufficient.
         """
         print(f"DEBUG: Starting smart fallback approach with {len(state.retrieved_docs)} retrieved docs")
+        on_token = (config or {}).get("configurable", {}).get("on_token")
+        
+        # Speculatively start the Wikipedia lookup so it overlaps the document LLM call
+        wiki_task = asyncio.create_task(self.afetch_wikipedia(state.question))
         
         # Step 1: Try to answer with uploaded documents
-        doc_answer = self.answer_with_documents(state)
+        try:
+            doc_answer = await self.aanswer_with_documents(state, on_token)
+        except Exception as e:
+            self._discard_task(wiki_task)
+            return self._failed_state(state, f"Error processing documents: {str(e)}", e, on_token)
         print(f"DEBUG: Document answer: {doc_answer[:100]}...")
         
         # Step 2: Check if the answer is incomplete
         if self.is_incomplete_answer(doc_answer):
             print("DEBUG: Document answer incomplete, trying Wikipedia fallback")
-            final_answer = self.answer_with_wikipedia(state, doc_answer)
+            # The final answer is exactly what was streamed: the document
+            # answer, a separator, then the supplemented answer (or a note)
+            answer_prefix = doc_answer + self._FALLBACK_SEPARATOR
+            if on_token is not None:
+                on_token(self._FALLBACK_SEPARATOR)
+            try:
+                final_answer = answer_prefix + await self.aanswer_with_wikipedia(state, doc_answer, wiki_task, on_token)
+            except Exception as e:
+                note = self._wikipedia_error_note(e)
+                return self._failed_state(state, answer_prefix + note, e, on_token, note)
         else:
             print("DEBUG: Document answer sufficient, using document-only response")
+            self._discard_task(wiki_task)
             final_answer = doc_answer
         
         return RAGState(
@@ -182,13 +499,14 @@ FINAL ANSWER:"""
             if not state.retrieved_docs:
                 return "No documents available from uploads."
             
-            context_parts = []
-            for i, doc in enumerate(state.retrieved_docs, 1):
+            context_parts = ["UPLOADED DOCUMENTS:\n\n"]
+            for i, doc in enumerate(self.expand_to_parents(state.retrieved_docs), 1):
                 meta = doc.metadata if hasattr(doc, "metadata") else {}
                 source = meta.get("source", f"Document {i}")
-                context_parts.append(f"[{source}]\n{doc.page_content[:800]}")
+                context_parts.extend(("[", str(source), "]\n", doc.page_content[:800], "\n\n"))
             
-            return "UPLOADED DOCUMENTS:\n\n" + "\n\n".join(context_parts)
+            context_parts.pop()  # drop the trailing separator
+            return "".join(context_parts)
 
         def wikipedia_tool(query: str) -> str:
             """Secondary tool: Wikipedia search"""
@@ -223,6 +541,8 @@ FINAL ANSWER:"""
 Be intelligent about tool selection - don't use Wikipedia unless necessary."""
 
         # Create and run agent
+        from langgraph.prebuilt import create_react_agent
+        
         agent = create_react_agent(self.llm, tools=tools, prompt=system_prompt)
         
         result = agent.invoke({
@@ -9,4 +9,5 @@ class RAGState(BaseModel):
     
     question: str
     retrieved_docs: List[Document] = []
-    answer: str = ""
\ No newline at end of file
+    answer: str = ""
+    error: str = ""
\ No newline at end of file
@@ -1,34 +1,191 @@
 """Vector store module for document embedding and retrieval"""
 
-from typing import List
-from langchain_community.vectorstores import FAISS
+from typing import Dict, List, Optional, Union
+from pathlib import Path
+import hashlib
+import json
+import functools
+import shutil
+import tempfile
 # from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.schema import Document
+from src.config.config import Config
 from dotenv import load_dotenv
 load_dotenv()
 import os
 
+@functools.lru_cache(maxsize=None)
+def _get_embedding(model_name: str):
+    """Return the embedding model shared by all vector stores"""
+    # Imported lazily: sentence-transformers pulls in torch
+    from langchain_huggingface import HuggingFaceEmbeddings
+    
+    return HuggingFaceEmbeddings(model_name=model_name)
+
 class VectorStore:
     """Manages vector store operations"""
     
-    def __init__(self):
+    def __init__(self, model_name: str = Config.EMBEDDING_MODEL):
 
-        """Initialize vector store with OpenAI embeddings"""
+        """Initialize vector store with Hugging Face embeddings"""
 
-        self.embedding = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")                                                                    
+        self.embedding = _get_embedding(model_name)
         self.vectorstore = None
         self.retriever = None
+        # Parent chunk text by parent_id, for small-to-big retrieval
+        self.parent_docs: Dict[str, str] = {}
     
-    def create_vectorstore(self, documents: List[Document]):
+    def create_vectorstore(self, documents: List[Document],
+                           embeddings: Optional[List[List[float]]] = None,
+                           parent_docs: Optional[Dict[str, str]] = None):
         """
         Create vector store from documents
         
         Args:
             documents: List of documents to embed
+            embeddings: Precomputed embeddings aligned with documents
+                (documents are embedded here if omitted)
+            parent_docs: Optional mapping of parent_id to parent chunk text
+        """
+        self.parent_docs = parent_docs or {}
+        from langchain_community.vectorstores import FAISS
+        
+        if embeddings is None:
+            self.vectorstore = FAISS.from_documents(documents, self.embedding)
+        else:
+            self.vectorstore = FAISS.from_embeddings(
+                text_embeddings=[
+                    (doc.page_content, vector)
+                    for doc, vector in zip(documents, embeddings)
+                ],
+                embedding=self.embedding,
+                metadatas=[doc.metadata for doc in documents]
+            )
+        self.retriever = self.vectorstore.as_retriever()
+    
+    def fingerprint(self, documents: List[Document]) -> str:
         """
-        self.vectorstore = FAISS.from_documents(documents, self.embedding)
+        Compute a content hash identifying the embedded corpus
+        
+        Args:
+            documents: List of documents to embed
+            
+        Returns:
+            Hex digest over the embedding model and sorted chunk contents
+        """
+        hasher = hashlib.blake2b()
+        hasher.update(self.embedding.model_name.encode())
+        for content in sorted(doc.page_content.encode() for doc in documents):
+            hasher.update(b"||")
+            hasher.update(content)
+        return hasher.hexdigest()
+    
+    def load_local(self, path: Union[str, Path]) -> bool:
+        """
+        Load a previously saved vector store
+        
+        Args:
+            path: Directory the vector store was saved to
+            
+        Returns:
+            True if the vector store was loaded, False on a cache miss
+        """
+        path = Path(path)
+        if not path.exists():
+            return False
+        
+        from langchain_community.vectorstores import FAISS
+        
+        try:
+            # The index was written by save_local, so its pickle is trusted
+            vectorstore = FAISS.load_local(
+                str(path),
+                self.embedding,
+                allow_dangerous_deserialization=True
+            )
+            parent_docs = json.loads((path / "parents.json").read_text())
+        except Exception as e:
+            # Unreadable or incomplete (e.g. written by an older version):
+            # drop it so the rebuilt store can take its place
+            print(f"Discarding vector store cache {path}: {str(e)}")
+            shutil.rmtree(path, ignore_errors=True)
+            return False
+        
+        self.vectorstore = vectorstore
         self.retriever = self.vectorstore.as_retriever()
+        self.parent_docs = parent_docs
+        try:
+            # Mark as recently used for prune_cache
+            os.utime(path)
+        except FileNotFoundError:
+            # Pruned by another session after loading; the store is in memory
+            pass
+        return True
+    
+    def save_local(self, path: Union[str, Path]):
+        """
+        Save the vector store (and its parent chunks) to disk
+        
+        The files are written to a temporary sibling directory which is then
+        renamed into place, so a reader never sees a partially written store.
+        
+        Args:
+            path: Directory to save the vector store to
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vector store not initialized. Call create_vectorstore first.")
+        
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}."))
+        try:
+            self.vectorstore.save_local(str(tmp_path))
+            (tmp_path / "parents.json").write_text(json.dumps(self.parent_docs))
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process saved the same store first
+            if not path.exists():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    
+    @staticmethod
+    def prune_cache(cache_dir: Union[str, Path], max_entries: int):
+        """
+        Delete the least recently used saved vector stores
+        
+        Args:
+            cache_dir: Directory holding saved vector stores
+            max_entries: Number of stores to keep
+        """
+        cache_dir = Path(cache_dir)
+        if not cache_dir.is_dir():
+            return
+        
+        # Hidden entries are in-progress saves
+        entries = []
+        for entry in cache_dir.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                # Already removed by a concurrent prune
+                continue
+        entries.sort(reverse=True)
+        for _, entry in entries[max_entries:]:
+            shutil.rmtree(entry, ignore_errors=True)
+    
+    def count(self) -> int:
+        """
+        Get the number of embedded chunks
+        
+        Returns:
+            Number of vectors in the store
+        """
+        if self.vectorstore is None:
+            raise ValueError("Vector store not initialized. Call create_vectorstore first.")
+        return self.vectorstore.index.ntotal
     
     def get_retriever(self):
         """
@@ -7,6 +7,10 @@ import time
 import tempfile
 import os
 import shutil
+import hashlib
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
@@ -62,53 +66,223 @@ def init_session_state():
         st.session_state.initialized = False
     if 'history' not in st.session_state:
         st.session_state.history = []
+    if 'corpus_key' not in st.session_state:
+        st.session_state.corpus_key = None
+    if 'answer_cache' not in st.session_state:
+        st.session_state.answer_cache = OrderedDict()
 
+def get_cached_answer(cache_key):
+    """Return a cached answer for (corpus_key, question), or None if missing or expired"""
+    answer_cache = st.session_state.answer_cache
+    entry = answer_cache.get(cache_key)
+    if entry is None:
+        return None
+    
+    cached_at, result = entry
+    if time.time() - cached_at > Config.ANSWER_CACHE_TTL:
+        del answer_cache[cache_key]
+        return None
+    
+    answer_cache.move_to_end(cache_key)
+    return result
+
+def cache_answer(cache_key, result):
+    """Cache a successful answer, evicting the least recently used beyond the limit"""
+    # Don't replay transient LLM / Wikipedia failures
+    if result.get('error'):
+        return
+    
+    answer_cache = st.session_state.answer_cache
+    answer_cache[cache_key] = (time.time(), result)
+    answer_cache.move_to_end(cache_key)
+    while len(answer_cache) > Config.ANSWER_CACHE_SIZE:
+        answer_cache.popitem(last=False)
+
+@contextlib.contextmanager
 def save_uploaded_files(uploaded_files):
-    """Save uploaded files to temporary directory and return file paths"""
-    temp_dir = tempfile.mkdtemp()
-    file_paths = []
+    """
+    Save uploaded files to a temporary directory and yield their paths
     
-    for uploaded_file in uploaded_files:
-        file_path = os.path.join(temp_dir, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        file_paths.append(file_path)
+    The directory and its files are removed when the context exits.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def save(indexed_file):
+            # A subdirectory per upload keeps same-named files from colliding
+            index, uploaded_file = indexed_file
+            file_dir = os.path.join(temp_dir, str(index))
+            os.makedirs(file_dir)
+            file_path = os.path.join(file_dir, uploaded_file.name)
+            uploaded_file.seek(0)
+            with open(file_path, "wb") as f:
+                # Stream in 1 MB blocks instead of materializing the whole upload
+                shutil.copyfileobj(uploaded_file, f, 1 << 20)
+            return file_path
+        
+        with ThreadPoolExecutor(max_workers=min(Config.LOAD_WORKERS, len(uploaded_files))) as executor:
+            file_paths = list(executor.map(save, enumerate(uploaded_files)))
+        
+        yield file_paths
+
+def compute_corpus_key(uploaded_files=None, urls=None, file_paths=None):
+    """Fingerprint uploaded file contents, files on disk, or URLs to identify a corpus"""
+    hasher = hashlib.blake2b()
     
-    return file_paths, temp_dir
+    if uploaded_files:
+        digests = sorted(
+            hashlib.blake2b(uploaded_file.getbuffer()).hexdigest()
+            for uploaded_file in uploaded_files
+        )
+        parts = ["files"] + digests
+    elif file_paths:
+        digests = []
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                digests.append(hashlib.file_digest(f, hashlib.blake2b).hexdigest())
+        parts = ["files"] + sorted(digests)
+    else:
+        parts = ["sources"] + list(urls or [])
+    
+    for part in parts:
+        hasher.update(part.encode())
+        hasher.update(b"\n")
+    
+    return hasher.hexdigest()
 
-def initialize_rag_with_files(file_paths=None, urls=None):
-    """Initialize the RAG system with files or URLs"""
+def vectorstore_cache_path(*key_parts):
+    """Return the on-disk vector store location for a cache key, or None if caching is off"""
+    if not Config.VECTORSTORE_CACHE_DIR:
+        return None
+    
+    key = hashlib.blake2b("\n".join(str(part) for part in key_parts).encode()).hexdigest()
+    return Path(Config.VECTORSTORE_CACHE_DIR) / key
+
+def save_to_cache(vector_store, cache_path):
+    """Persist a vector store to the on-disk cache and evict old entries"""
+    # The cache is only an optimisation - never fail a finished build over it
     try:
-        # Initialize components
-        llm = Config.get_llm()
-        doc_processor = DocumentProcessor(
-            chunk_size=Config.CHUNK_SIZE,
-            chunk_overlap=Config.CHUNK_OVERLAP
+        vector_store.save_local(cache_path)
+        VectorStore.prune_cache(Config.VECTORSTORE_CACHE_DIR, Config.VECTORSTORE_CACHE_MAX_ENTRIES)
+    except OSError as e:
+        print(f"Could not update vector store cache {cache_path}: {str(e)}")
+
+def make_split_fn(doc_processor, parent_docs):
+    """
+    Return the chunking function for ingestion
+    
+    With parent-child retrieval, small children are returned for embedding
+    and their parents are collected into parent_docs for the LLM.
+    """
+    def split(docs):
+        if not Config.PARENT_CHILD_RETRIEVAL:
+            return doc_processor.split_documents(docs)
+        
+        children, parents = doc_processor.split_hierarchical(
+            docs,
+            parent_size=Config.PARENT_CHUNK_SIZE,
+            child_size=Config.CHILD_CHUNK_SIZE,
+            overlap=Config.CHUNK_OVERLAP
+        )
+        parent_docs.update(parents)
+        return children
+    
+    return split
+
+@st.cache_resource(show_spinner=False, max_entries=Config.MAX_CACHED_CORPORA)
+def build_rag_system(corpus_key, _file_paths=None, urls=None, _on_progress=None):
+    """
+    Build the RAG system for a corpus
+    
+    Cached on corpus_key, so re-processing an identical corpus (or any
+    Streamlit rerun) reuses the existing graph instead of re-embedding.
+    """
+    # Initialize components
+    llm = Config.get_llm()
+    doc_processor = DocumentProcessor(
+        chunk_size=Config.CHUNK_SIZE,
+        chunk_overlap=Config.CHUNK_OVERLAP,
+        max_workers=Config.LOAD_WORKERS,
+        tokenizer_name=Config.EMBEDDING_MODEL
+    )
+    vector_store = VectorStore(model_name=Config.EMBEDDING_MODEL)
+    parent_docs = {}
+    split_fn = make_split_fn(doc_processor, parent_docs)
+    report = _on_progress or (lambda message: None)
+    
+    if _file_paths:
+        # corpus_key already fingerprints the file contents, so a persisted
+        # vector store can be found before parsing anything
+        cache_path = vectorstore_cache_path(
+            corpus_key, vector_store.embedding.model_name, Config.CHUNK_SIZE,
+            Config.CHUNK_OVERLAP, Config.PARENT_CHILD_RETRIEVAL,
+            Config.CHILD_CHUNK_SIZE, Config.PARENT_CHUNK_SIZE
         )
-        vector_store = VectorStore()
         
-        # Process documents
-        if file_paths:
-            documents = doc_processor.process_files(file_paths)
-        elif urls:
-            documents = doc_processor.process_urls(urls)
-        else:
-            raise ValueError("No documents provided for processing")
+        if cache_path is None or not vector_store.load_local(cache_path):
+            # Parse files and embed their chunks in an overlapping pipeline
+            documents, embeddings = doc_processor.embed_chunk_stream(
+                doc_processor.iter_process_files(_file_paths, split_fn),
+                vector_store.embedding,
+                batch_size=Config.EMBEDDING_BATCH_SIZE,
+                max_workers=Config.EMBED_WORKERS,
+                on_progress=lambda count: report(f"Parsed and queued {count} chunks for embedding...")
+            )
+            if not documents:
+                raise ValueError("No documents could be loaded from the provided files")
+            
+            vector_store.create_vectorstore(documents, embeddings, parent_docs)
+            if cache_path is not None:
+                save_to_cache(vector_store, cache_path)
+    elif urls:
+        report("Loading URLs...")
+        documents = split_fn(doc_processor.load_urls(urls))
         
         if not documents:
             raise ValueError("No documents were processed")
         
-        # Create vector store
-        vector_store.create_vectorstore(documents)
-        
-        # Build graph
-        graph_builder = GraphBuilder(
-            retriever=vector_store.get_retriever(),
-            llm=llm
+        # Pages are fetched fresh whenever this corpus isn't already built in
+        # memory (that cache is keyed on the URL list), and they can change,
+        # so the on-disk cache is keyed on the fetched chunks instead
+        cache_path = vectorstore_cache_path(
+            vector_store.fingerprint(documents), Config.PARENT_CHILD_RETRIEVAL,
+            Config.PARENT_CHUNK_SIZE
         )
-        graph_builder.build()
         
-        return graph_builder, len(documents)
+        if cache_path is None or not vector_store.load_local(cache_path):
+            report(f"Embedding {len(documents)} chunks...")
+            # Create vector store from batched embeddings
+            embeddings = doc_processor.embed_chunks(
+                documents,
+                vector_store.embedding,
+                batch_size=Config.EMBEDDING_BATCH_SIZE
+            )
+            vector_store.create_vectorstore(documents, embeddings, parent_docs)
+            if cache_path is not None:
+                save_to_cache(vector_store, cache_path)
+    else:
+        raise ValueError("No documents provided for processing")
+    
+    # Build graph
+    graph_builder = GraphBuilder(
+        retriever=vector_store.get_retriever(),
+        llm=llm,
+        parent_docs=vector_store.parent_docs
+    )
+    graph_builder.build()
+    
+    return graph_builder, vector_store.count()
+
+def initialize_rag_with_files(file_paths=None, urls=None, corpus_key=None, on_progress=None):
+    """Initialize the RAG system with files or URLs"""
+    try:
+        if corpus_key is None:
+            corpus_key = compute_corpus_key(urls=urls, file_paths=file_paths)
+        
+        return build_rag_system(
+            corpus_key,
+            _file_paths=file_paths,
+            urls=urls,
+            _on_progress=on_progress
+        )
         
     except Exception as e:
         st.error(f"Failed to initialize: {str(e)}")
@@ -154,18 +328,24 @@ def main():
                 
                 # Initialize button
                 if st.button(" Process Uploaded Files", use_container_width=True):
-                    with st.spinner("Processing uploaded files..."):
-                        file_paths, temp_dir = save_uploaded_files(uploaded_files)
-                        rag_system, num_chunks = initialize_rag_with_files(file_paths=file_paths)
+                    with st.status("Processing uploaded files...") as status:
+                        corpus_key = compute_corpus_key(uploaded_files=uploaded_files)
+                        with save_uploaded_files(uploaded_files) as file_paths:
+                            rag_system, num_chunks = initialize_rag_with_files(
+                                file_paths=file_paths,
+                                corpus_key=corpus_key,
+                                on_progress=lambda message: status.update(label=message)
+                            )
                         
                         if rag_system:
+                            status.update(label="Processing complete", state="complete")
                             st.session_state.rag_system = rag_system
+                            st.session_state.corpus_key = corpus_key
                             st.session_state.initialized = True
                             st.success(f" System ready with {num_chunks} document chunks!")
                             st.rerun()
-                        
-                        # Clean up temp files
-                        shutil.rmtree(temp_dir, ignore_errors=True)
+                        else:
+                            status.update(label="Processing failed", state="error")
             
             st.markdown('</div>', unsafe_allow_html=True)
     
@@ -188,10 +368,15 @@ def main():
             
             if st.button(" Process Custom URLs", use_container_width=True):
                 with st.spinner("Processing custom URLs..."):
-                    rag_system, num_chunks = initialize_rag_with_files(urls=urls)
+                    corpus_key = compute_corpus_key(urls=urls)
+                    rag_system, num_chunks = initialize_rag_with_files(
+                        urls=urls,
+                        corpus_key=corpus_key
+                    )
                     
                     if rag_system:
                         st.session_state.rag_system = rag_system
+                        st.session_state.corpus_key = corpus_key
                         st.session_state.initialized = True
                         st.success(f" System ready with {num_chunks} document chunks!")
                         st.rerun()
@@ -202,27 +387,86 @@ def main():
     if st.session_state.initialized:
         st.markdown("###  Search Interface")
         
+        batch_mode = st.checkbox("Ask multiple questions (one per line)")
+        
         # Search interface - using columns for better layout
         col1, col2 = st.columns([4, 1])
         
         with col1:
-            question = st.text_input(
-                "Enter your question:",
-                placeholder="What would you like to know?"
-            )
+            if batch_mode:
+                question = st.text_area(
+                    "Enter your questions:",
+                    placeholder="What would you like to know?\nWhat else would you like to know?",
+                    height=100
+                )
+            else:
+                question = st.text_input(
+                    "Enter your question:",
+                    placeholder="What would you like to know?"
+                )
         
         with col2:
             st.write("")  # Add some space
             submit = st.button(" Search", use_container_width=True)
         
+        # Process batched search
+        if submit and batch_mode and question.strip():
+            questions = [q.strip() for q in question.split('\n') if q.strip()]
+            
+            if st.session_state.rag_system:
+                with st.spinner(f"Searching {len(questions)} questions..."):
+                    start_time = time.time()
+                    
+                    # Answer uncached questions in one batched graph run
+                    corpus_key = st.session_state.corpus_key
+                    answers = {}
+                    for q in dict.fromkeys(questions):
+                        cached = get_cached_answer((corpus_key, q))
+                        if cached is not None:
+                            answers[q] = cached
+                    pending = [q for q in dict.fromkeys(questions) if q not in answers]
+                    if pending:
+                        for q, result in zip(pending, st.session_state.rag_system.run_batch(pending)):
+                            answers[q] = result
+                            cache_answer((corpus_key, q), result)
+                    results = [answers[q] for q in questions]
+                    
+                    elapsed_time = time.time() - start_time
+                    
+                    st.markdown("###  Answers")
+                    for q, result in zip(questions, results):
+                        # Add to history
+                        st.session_state.history.append({
+                            'question': q,
+                            'answer': result['answer'],
+                            'time': elapsed_time / len(questions)
+                        })
+                        
+                        st.markdown(f"**Q:** {q}")
+                        st.success(result['answer'])
+                    
+                    st.caption(f" Response time: {elapsed_time:.2f} seconds for {len(questions)} questions")
+            else:
+                st.error("System not initialized. Please load documents first.")
+        
         # Process search
-        if submit and question:
+        elif submit and question:
             if st.session_state.rag_system:
                 with st.spinner("Searching..."):
                     start_time = time.time()
                     
-                    # Get answer
-                    result = st.session_state.rag_system.run(question)
+                    cache_key = (st.session_state.corpus_key, question)
+                    st.markdown("###  Answer")
+                    
+                    result = get_cached_answer(cache_key)
+                    if result is not None:
+                        # Identical question on the same corpus - reuse the answer
+                        st.success(result['answer'])
+                    else:
+                        # Stream answer tokens as they are generated
+                        result = st.session_state.rag_system.run_stream(question)
+                        st.write_stream(result['answer_stream'])
+                        cache_answer(cache_key, result)
                     
                     elapsed_time = time.time() - start_time
                     
@@ -233,10 +477,6 @@ def main():
                         'time': elapsed_time
                     })
                     
-                    # Display answer
-                    st.markdown("###  Answer")
-                    st.success(result['answer'])
-                    
                     # Show retrieved docs with wider layout
                     with st.expander(" Source Documents", expanded=True):
                         if 'retrieved_docs' in result and result['retrieved_docs']:
@@ -316,6 +556,8 @@ def main():
             st.session_state.rag_system = None
             st.session_state.initialized = False
             st.session_state.history = []
+            st.session_state.corpus_key = None
+            st.session_state.answer_cache = OrderedDict()
             st.rerun()
 
 if __name__ == "__main__":